@@ -4,6 +4,10 @@ Gym Membership Management System.
 This module handles the logic for calculating gym membership costs,
 applying discounts, and interacting with the user via CLI.
 """
+import re
+import sys
+from functools import lru_cache
+from typing import NamedTuple
 
 MEMBERSHIP_PLANS = {
     "Basic": 50,
@@ -19,6 +23,30 @@ ADDITIONAL_FEATURES = {
     "4": {"name": "Nutritional Plan", "cost": 60, "is_premium": True}
 }
 
+# Struct-of-arrays view of ADDITIONAL_FEATURES built once at import.
+# Feature key "n" maps to index n - 1; bit i of the mask is set iff
+# feature i + 1 is premium.
+_FEAT_KEYS = frozenset(ADDITIONAL_FEATURES)
+_FEAT_ORDER = tuple(ADDITIONAL_FEATURES[str(i + 1)] for i in range(len(ADDITIONAL_FEATURES)))
+_FEAT_COSTS = tuple(data["cost"] for data in _FEAT_ORDER)
+_FEAT_NAMES = tuple(data["name"] for data in _FEAT_ORDER)
+_FEAT_PREMIUM_MASK = sum(1 << i for i, data in enumerate(_FEAT_ORDER) if data["is_premium"])
+
+# Matches one feature key in a comma/space separated selection
+_FEAT_RE = re.compile(r"[^,\s]+")
+
+# Special offer discount indexed by tier (see _calc_cached)
+_SPECIAL_OFFER_TIERS = (0, 20, 50)
+
+
+class CostDetails(NamedTuple):
+    """Breakdown of a membership cost calculation (amounts in integer cents)."""
+    base_total: int
+    surcharge: int
+    group_discount: int
+    special_discount: int
+    features_names: tuple
+
 
 def display_menu():
     """Display available membership plans."""
@@ -35,67 +63,86 @@ def display_features():
         print(f"{key}. {data['name']} (${data['cost']}) {type_str}")
 
 
+def _validate_feature_keys(selected_features_keys):
+    """Raise ValueError if any selected feature key is unknown."""
+    missing = set(selected_features_keys) - _FEAT_KEYS
+    if missing:
+        raise ValueError(f"Invalid feature key: {', '.join(sorted(map(repr, missing)))}")
+
+
 def _get_features_details(selected_features_keys):
     """
     Calculate cost and gather names of selected features.
+    Keys must already be validated with _validate_feature_keys.
     Returns: (features_cost, selected_names, has_premium)
     """
     features_cost = 0
     selected_names = []
-    has_premium = False
-
+    selected_mask = 0
     for key in selected_features_keys:
-        if key in ADDITIONAL_FEATURES:
-            feat = ADDITIONAL_FEATURES[key]
-            features_cost += feat["cost"]
-            selected_names.append(feat["name"])
-            if feat["is_premium"]:
-                has_premium = True
-        else:
-            raise ValueError(f"Invalid feature key: {key}")
+        idx = int(key) - 1
+        selected_mask |= 1 << idx
+        features_cost += _FEAT_COSTS[idx]
+        selected_names.append(_FEAT_NAMES[idx])
+
+    has_premium = (selected_mask & _FEAT_PREMIUM_MASK) != 0
     return features_cost, selected_names, has_premium
 
 
-def calculate_total_cost(plan_name, selected_features_keys, num_members):
+@lru_cache(maxsize=512)
+def _calc_cached(plan_name, features_keys, num_members):
     """
-    Calculate the total cost applying surcharges and discounts.
-    Returns: (final_cost_int, details_dict)
+    Pure cost computation over validated, hashable inputs.
+    Returns: (final_cost_int, CostDetails)
     """
-    if plan_name not in MEMBERSHIP_PLANS:
-        raise ValueError("Invalid membership plan.")
-
     base_cost = MEMBERSHIP_PLANS[plan_name]
-    feat_cost, feat_names, has_premium = _get_features_details(selected_features_keys)
+    # Sorted so the cached result does not depend on set iteration order
+    ordered_keys = sorted(features_keys, key=int)
+    feat_cost, feat_names, has_premium = _get_features_details(ordered_keys)
 
     # Subtotal per person
     total_gross = (base_cost + feat_cost) * num_members
 
-    # 1. Premium Surcharge (15%)
-    surcharge = total_gross * 0.15 if has_premium else 0.0
-    total_after_surcharge = total_gross + surcharge
+    # Integer-only math: totals are kept scaled so no precision is lost.
+    # 1. Premium Surcharge (15%), bools act as 0/1 multipliers
+    after_surcharge_x100 = total_gross * (100 + 15 * has_premium)
 
     # 2. Group Discount (10% if 2+ members)
-    group_discount = total_after_surcharge * 0.10 if num_members >= 2 else 0.0
-    total_after_group = total_after_surcharge - group_discount
+    after_group_x1000 = after_surcharge_x100 * (10 - (num_members >= 2))
 
-    # 3. Special Offer Discount
-    special_discount = 0.0
-    if total_after_group > 400:
-        special_discount = 50.0
-    elif total_after_group > 200:
-        special_discount = 20.0
+    # 3. Special Offer Discount: tier 0 (<= 200), 1 (> 200), 2 (> 400)
+    tier = (after_group_x1000 > 200_000) + (after_group_x1000 > 400_000)
+    special_discount = _SPECIAL_OFFER_TIERS[tier]
 
-    final_total = max(0, total_after_group - special_discount)
+    final_total = max(0, after_group_x1000 // 1000 - special_discount)
 
-    details = {
-        "base_total": total_gross,
-        "surcharge": surcharge,
-        "group_discount": group_discount,
-        "special_discount": special_discount,
-        "features_names": feat_names
-    }
+    # Breakdown in cents (the "x100" scale), formatted only at display time
+    details = CostDetails(total_gross * 100,
+                          after_surcharge_x100 - total_gross * 100,
+                          after_surcharge_x100 * (num_members >= 2) // 10,
+                          special_discount * 100,
+                          tuple(feat_names))
+    return final_total, details
 
-    return int(final_total), details
+
+def calculate_total_cost(plan_name, selected_features_keys, num_members):
+    """
+    Calculate the total cost applying surcharges and discounts.
+    Each feature is counted once, regardless of repeated keys.
+    Returns: (final_cost_int, CostDetails)
+    """
+    if plan_name not in MEMBERSHIP_PLANS:
+        raise ValueError("Invalid membership plan.")
+    # Integral values such as 2.0 are accepted; the math below stays int-only
+    if num_members != int(num_members):
+        raise ValueError("Number of members must be a whole number.")
+    num_members = int(num_members)
+
+    features_keys = frozenset(selected_features_keys)
+    # Validate before touching the cache so invalid input never reaches it
+    _validate_feature_keys(features_keys)
+
+    return _calc_cached(plan_name, features_keys, num_members)
 
 
 def get_user_input_plan():
@@ -127,33 +174,46 @@ def get_user_input_features():
     """Get and validate features selection."""
     display_features()
     print("Enter feature numbers separated by comma (e.g., 1,3) or leave empty.")
-    f_input = input("Selection: ").strip()
-    selected_keys = [k.strip() for k in f_input.split(',')] if f_input else []
+    # Repeated keys are dropped, matching how calculate_total_cost prices them
+    selected_keys = list(dict.fromkeys(_FEAT_RE.findall(input("Selection: "))))
 
     # Validate existence
-    for key in selected_keys:
-        if key not in ADDITIONAL_FEATURES:
-            print(f"Error: Feature '{key}' is not available.")
-            return None
+    invalid = set(selected_keys).difference(ADDITIONAL_FEATURES)
+    if len(invalid) == 1:
+        print(f"Error: Feature '{invalid.pop()}' is not available.")
+        return None
+    if invalid:
+        quoted = ', '.join(f"'{key}'" for key in sorted(invalid))
+        print(f"Error: Features {quoted} are not available.")
+        return None
     return selected_keys
 
 
+def _format_cents(cents):
+    """Format an integer amount of cents as dollars, e.g. 3680 -> '36.80'."""
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
 def confirm_purchase(plan, num_members, cost, details):
     """Display summary and ask for confirmation."""
-    print("\n--- CONFIRMATION ---")
-    feat_str = ', '.join(details['features_names']) if details['features_names'] else 'None'
-    print(f"Plan: {plan} (x{num_members} members)")
-    print(f"Features: {feat_str}")
-    print(f"Gross Total: ${details['base_total']:.2f}")
-
-    if details['surcharge'] > 0:
-        print(f"Premium Surcharge (+15%): +${details['surcharge']:.2f}")
-    if details['group_discount'] > 0:
-        print(f"Group Discount (-10%): -${details['group_discount']:.2f}")
-    if details['special_discount'] > 0:
-        print(f"Special Offer Discount: -${details['special_discount']:.2f}")
-
-    print(f"\nFINAL TOTAL COST: ${cost}")
+    feat_str = ', '.join(details.features_names) if details.features_names else 'None'
+    lines = [
+        "\n--- CONFIRMATION ---",
+        f"Plan: {plan} (x{num_members} members)",
+        f"Features: {feat_str}",
+        f"Gross Total: ${_format_cents(details.base_total)}",
+    ]
+
+    if details.surcharge > 0:
+        lines.append(f"Premium Surcharge (+15%): +${_format_cents(details.surcharge)}")
+    if details.group_discount > 0:
+        lines.append(f"Group Discount (-10%): -${_format_cents(details.group_discount)}")
+    if details.special_discount > 0:
+        lines.append(f"Special Offer Discount: -${_format_cents(details.special_discount)}")
+
+    lines.append(f"\nFINAL TOTAL COST: ${cost}")
+    # Emit the whole summary in a single write
+    sys.stdout.write("\n".join(lines) + "\n")
 
     confirm = input("\nDo you want to confirm this membership? (yes/no): ").lower()
     if confirm in ('yes', 'y'):
@@ -1,8 +1,10 @@
 """
 Unit tests for the Gym Membership System.
 """
+import io
 import unittest
-from gym_system import calculate_total_cost
+from unittest import mock
+from gym_system import calculate_total_cost, confirm_purchase, get_user_input_features
 
 
 class TestGymMembershipSystem(unittest.TestCase):
@@ -61,11 +63,112 @@ class TestGymMembershipSystem(unittest.TestCase):
         cost, _ = calculate_total_cost("Premium", ["4"], 2)
         self.assertEqual(cost, 311)
 
+    def test_cost_details_breakdown(self):
+        """Test that the returned breakdown adds up to the final cost."""
+        cost, details = calculate_total_cost("Premium", ["4"], 2)
+        # Amounts are in cents: 320.00 + 48.00 - 36.80 - 20.00 = 311.20
+        self.assertEqual(details.base_total, 32000)
+        self.assertEqual(details.surcharge, 4800)
+        self.assertEqual(details.group_discount, 3680)
+        self.assertEqual(details.special_discount, 2000)
+        self.assertEqual(details.features_names, ("Nutritional Plan",))
+        self.assertEqual(
+            (details.base_total + details.surcharge
+             - details.group_discount - details.special_discount) // 100,
+            cost,
+        )
+
+    def test_confirmation_breakdown_display(self):
+        """Test the breakdown lines shown before confirming a purchase."""
+        cost, details = calculate_total_cost("Premium", ["4"], 2)
+        with mock.patch("builtins.input", return_value="no"), \
+                mock.patch("sys.stdout", new_callable=io.StringIO) as out:
+            self.assertFalse(confirm_purchase("Premium", 2, cost, details))
+        self.assertIn(
+            "Gross Total: $320.00\n"
+            "Premium Surcharge (+15%): +$48.00\n"
+            "Group Discount (-10%): -$36.80\n"
+            "Special Offer Discount: -$20.00\n"
+            "\nFINAL TOTAL COST: $311\n",
+            out.getvalue(),
+        )
+
+    def test_non_integer_members(self):
+        """Test that integral floats are accepted and fractional ones rejected."""
+        cost, _ = calculate_total_cost("Basic", [], 2.0)
+        self.assertEqual(cost, 90)
+        with self.assertRaises(ValueError):
+            calculate_total_cost("Basic", ["1"], 2.5)
+
+    def test_feature_order_does_not_matter(self):
+        """Test that feature selection order yields identical results."""
+        first = calculate_total_cost("Premium", ["4", "1"], 2)
+        second = calculate_total_cost("Premium", ["1", "4"], 2)
+        self.assertEqual(first, second)
+
+    def test_repeated_feature_counted_once(self):
+        """Test that a repeated feature key is only charged once."""
+        # Plan: Basic (50). Feature: Personal Training (30), once. Total: 80.
+        cost, details = calculate_total_cost("Basic", ["1", "1"], 1)
+        self.assertEqual(cost, 80)
+        self.assertEqual(details.features_names, ("Personal Training",))
+
     def test_invalid_plan(self):
         """Test error raising for invalid plan names."""
         with self.assertRaises(ValueError):
             calculate_total_cost("NonExistent", [], 1)
 
+    def test_invalid_feature(self):
+        """Test error raising for unknown feature keys."""
+        with self.assertRaises(ValueError):
+            calculate_total_cost("Basic", ["1", "9"], 1)
+        with self.assertRaises(ValueError):
+            calculate_total_cost("Basic", [1], 1)
+        with self.assertRaises(ValueError):
+            calculate_total_cost("Basic", ["x", 5], 1)
+
+
+class TestFeatureSelectionInput(unittest.TestCase):
+    """Test suite for parsing the feature selection entered by the user."""
+
+    def _select(self, text):
+        """Run get_user_input_features with the given input, capturing stdout."""
+        with mock.patch("builtins.input", return_value=text), \
+                mock.patch("sys.stdout", new_callable=io.StringIO) as out:
+            return get_user_input_features(), out.getvalue()
+
+    def test_comma_and_space_separated(self):
+        """Test that whitespace around keys is ignored."""
+        keys, _ = self._select("1, 3")
+        self.assertEqual(keys, ["1", "3"])
+
+    def test_empty_entries_are_skipped(self):
+        """Test that empty entries between commas are ignored."""
+        keys, _ = self._select("1,,3")
+        self.assertEqual(keys, ["1", "3"])
+
+    def test_repeated_keys_are_deduplicated(self):
+        """Test that repeated keys are kept once, in first-seen order."""
+        keys, _ = self._select("3,1,3,1")
+        self.assertEqual(keys, ["3", "1"])
+
+    def test_empty_selection(self):
+        """Test that an empty selection means no features."""
+        keys, _ = self._select("")
+        self.assertEqual(keys, [])
+
+    def test_invalid_feature(self):
+        """Test that an unknown key is rejected with an error message."""
+        keys, output = self._select("1,9")
+        self.assertIsNone(keys)
+        self.assertIn("Error: Feature '9' is not available.", output)
+
+    def test_multiple_invalid_features(self):
+        """Test the error message when several keys are unknown."""
+        keys, output = self._select("5,9")
+        self.assertIsNone(keys)
+        self.assertIn("Error: Features '5', '9' are not available.", output)
+
 
 if __name__ == '__main__':
     unittest.main()